@@ -7,9 +7,11 @@ as docs/report.tex without leaving Python.
 
 Usage (from repo root or any dir):
   python docs/build_pdf.py [--engine auto|latexmk|pdflatex] [--tex report.tex]
+  python docs/build_pdf.py --tex "*.tex"   # several files, built in parallel
 
 Defaults:
-  - engine: auto (prefer latexmk if available, else pdflatex x2)
+  - engine: auto (prefer latexmk if available, else pdflatex, up to --passes
+    runs, stopping early once the .aux/.toc/.out files stop changing)
   - tex: report.tex (relative to this docs/ folder)
   - shell-escape enabled (needed for \\includesvg)
 """
@@ -17,16 +19,22 @@ Defaults:
 from __future__ import annotations
 
 import argparse
+import functools
+import hashlib
+import json
 import os
 import platform
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import sys
 import glob
 
 
+@functools.lru_cache(maxsize=None)
 def which(cmd: str) -> str | None:
+    """Memoized shutil.which; the cache is cleared whenever PATH is changed."""
     return shutil.which(cmd)
 
 
@@ -59,6 +67,7 @@ def _prepend_to_env_path(paths: list[str]) -> None:
             new_parts.append(p)
     if new_parts:
         os.environ["PATH"] = sep.join(new_parts + current_parts)
+        which.cache_clear()
 
 
 def _common_tex_bins_windows() -> list[Path]:
@@ -90,109 +99,156 @@ def _common_inkscape_bins_windows() -> list[Path]:
     return candidates
 
 
+TOOL_CACHE = Path.home() / ".cache" / "build_pdf" / "tools.json"
+
+
+def _load_tool_cache(user_texbins: list[str]) -> dict[str, str]:
+    """Return cached tool directories, or {} if missing, unreadable or for other --texbin args."""
+    try:
+        data = json.loads(TOOL_CACHE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("texbin") != user_texbins:
+        return {}
+    return data
+
+
+def _save_tool_cache(user_texbins: list[str]) -> None:
+    """Record the directories the TeX and Inkscape binaries were found in."""
+    data: dict[str, object] = {"texbin": user_texbins}
+    tex = which("pdflatex") or which("latexmk")
+    if tex:
+        data["tex"] = str(Path(tex).parent)
+    ink = which("inkscape")
+    if ink:
+        data["inkscape"] = str(Path(ink).parent)
+    try:
+        TOOL_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        TOOL_CACHE.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    except OSError:
+        pass
+
+
+def _cached_dir_has(cached: str | None, *tools: str) -> bool:
+    return bool(cached) and any(shutil.which(t, path=cached) for t in tools)
+
+
 def ensure_tools_on_path(user_texbins: list[str], user_inkbins: list[str]) -> None:
     """Prepend likely TeX/InkScape bins to PATH so which() can find them.
 
     - Always prepend explicit user-provided bins first.
-    - If still not found on Windows, try common install paths.
+    - If still not found on Windows, try the directories cached in TOOL_CACHE
+      by a previous run, else scan common install paths and refresh the cache.
     """
     prepend: list[Path] = []
     prepend += [Path(p) for p in user_texbins if p]
     prepend += [Path(p) for p in user_inkbins if p]
 
+    scanned = False
     if platform.system().lower().startswith("win"):
-        # Try common paths if tools are missing
+        # Try cached, then common paths if tools are missing
         need_tex = which("pdflatex") is None and which("latexmk") is None
         need_ink = which("inkscape") is None
+        cache = _load_tool_cache(user_texbins) if need_tex or need_ink else {}
         if need_tex:
-            prepend += _common_tex_bins_windows()
+            cached = cache.get("tex")
+            if _cached_dir_has(cached, "pdflatex", "latexmk"):
+                prepend.append(Path(cached))
+            else:
+                prepend += _common_tex_bins_windows()
+                scanned = True
         if need_ink:
-            prepend += _common_inkscape_bins_windows()
+            cached = cache.get("inkscape")
+            if _cached_dir_has(cached, "inkscape"):
+                prepend.append(Path(cached))
+            else:
+                prepend += _common_inkscape_bins_windows()
+                scanned = True
 
     to_add = _unique_existing_paths(prepend)
     _prepend_to_env_path(to_add)
 
+    # Only rewrite the cache when a fallback scan may have found something new.
+    if scanned:
+        _save_tool_cache(user_texbins)
 
-def run(cmd: list[str], cwd: Path) -> int:
-    proc = subprocess.run(cmd, cwd=str(cwd))
-    return proc.returncode
 
+# Files pdflatex reads back on the next pass; if none changed, another pass is a no-op.
+RERUN_SUFFIXES = (".aux", ".toc", ".lof", ".lot", ".out")
 
-def main() -> int:
-    parser = argparse.ArgumentParser(description="Build LaTeX PDF (docs/report.tex)")
-    parser.add_argument("--engine", choices=["auto", "latexmk", "pdflatex"], default="auto")
-    parser.add_argument("--tex", default="report.tex", help="TeX filename relative to docs/")
-    parser.add_argument("--passes", type=int, default=2, help="pdflatex passes when not using latexmk")
-    parser.add_argument("--no-shell-escape", action="store_true", help="Disable -shell-escape")
-    parser.add_argument("--texbin", action="append", default=[], help="Directory with TeX binaries (pdflatex/latexmk). Can be passed multiple times; prepended to PATH for this run.")
-    parser.add_argument("--inkscape-bin", action="append", default=[], help="Directory with Inkscape binary; prepended to PATH for this run.")
-    args = parser.parse_args()
 
-    docs_dir = Path(__file__).resolve().parent
-    tex_path = docs_dir / args.tex
-
-    if not tex_path.exists():
-        print(f"[ERROR] TeX file not found: {tex_path}")
-        return 1
-
-    # Ensure tools are reachable on PATH for this process
-    ensure_tools_on_path(args.texbin, args.inkscape_bin)
-
-    # Detect inkscape if SVGs are included
-    includesvg = False
-    try:
-        content = tex_path.read_text(encoding="utf-8", errors="ignore")
-        includesvg = "\\includesvg" in content
-    except Exception:
-        pass
+def _aux_digest(tex_path: Path) -> bytes:
+    """Hash the auxiliary files next to tex_path (missing files hash as empty)."""
+    h = hashlib.blake2b()
+    for suffix in RERUN_SUFFIXES:
+        p = tex_path.with_suffix(suffix)
+        h.update(suffix.encode())
+        if p.exists():
+            h.update(p.read_bytes())
+    return h.digest()
 
-    if includesvg and which("inkscape") is None and not args.no_shell_escape:
-        print("[WARN] Inkscape not found on PATH, but \\includesvg is used.")
-        print("       Install Inkscape or rerun with --no-shell-escape and replace \\includesvg with \\includegraphics.")
 
-    # Choose engine
-    engine = args.engine
-    if engine == "auto":
-        engine = "latexmk" if which("latexmk") else "pdflatex"
+def run(cmd: list[str], cwd: Path) -> int:
+    proc = subprocess.run(cmd, cwd=str(cwd))
+    return proc.returncode
 
-    shell_escape_flag = [] if args.no_shell_escape else ["-shell-escape"]
 
+def resolve_tex_files(docs_dir: Path, patterns: list[str]) -> list[Path]:
+    """Expand --tex values (plain names or glob patterns) relative to docs/."""
+    found: list[Path] = []
+    for pattern in patterns:
+        if any(ch in pattern for ch in "*?["):
+            # glob.glob handles both relative and absolute patterns
+            matches = [Path(m) for m in sorted(glob.glob(str(docs_dir / pattern)))]
+        else:
+            matches = [docs_dir / pattern]
+        for p in matches:
+            if p not in found:
+                found.append(p)
+    return found
+
+
+def build_tex(tex_path: Path, engine: str, passes: int, shell_escape_flag: list[str]) -> int:
+    """Build one .tex file in its own directory; returns 0 or the failing exit code."""
+    cwd = tex_path.parent
     if engine == "latexmk":
-        if which("latexmk") is None:
-            print("[ERROR] latexmk not found on PATH; choose --engine pdflatex or install latexmk.")
-            return 2
         cmd = [
             "latexmk",
             "-pdf",
+            "-recorder",
             "-interaction=nonstopmode",
+            "-halt-on-error",
+            "-file-line-error",
             *shell_escape_flag,
             tex_path.name,
         ]
         print("[INFO] Running:", " ".join(cmd))
-        code = run(cmd, cwd=docs_dir)
+        code = run(cmd, cwd=cwd)
         if code != 0:
-            print(f"[ERROR] latexmk returned {code}")
+            print(f"[ERROR] latexmk returned {code} for {tex_path.name}")
             return code
     else:  # pdflatex
-        if which("pdflatex") is None:
-            print("[ERROR] pdflatex not found on PATH. Install MiKTeX/TeX Live or use --texbin to point to it.")
-            return 3
-        passes = max(1, int(args.passes))
         cmd = [
             "pdflatex",
             "-interaction=nonstopmode",
+            "-halt-on-error",
+            "-file-line-error",
             *shell_escape_flag,
             tex_path.name,
         ]
-        print("[INFO] Running pdflatex passes:", passes)
+        print(f"[INFO] Running pdflatex passes (max) for {tex_path.name}:", passes)
         for i in range(passes):
+            before = _aux_digest(tex_path)
             print(f"[INFO] Pass {i+1}/{passes}:", " ".join(cmd))
-            code = run(cmd, cwd=docs_dir)
+            code = run(cmd, cwd=cwd)
             if code != 0:
-                print(f"[ERROR] pdflatex returned {code} on pass {i+1}")
+                print(f"[ERROR] pdflatex returned {code} on pass {i+1} for {tex_path.name}")
                 return code
+            if i + 1 < passes and _aux_digest(tex_path) == before:
+                print(f"[INFO] Auxiliary files of {tex_path.name} unchanged; skipping remaining passes.")
+                break
 
-    pdf_path = docs_dir / (tex_path.with_suffix(".pdf").name)
+    pdf_path = tex_path.with_suffix(".pdf")
     if pdf_path.exists():
         print(f"[OK] Built: {pdf_path}")
         return 0
@@ -201,5 +257,73 @@ def main() -> int:
         return 4
 
 
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build LaTeX PDF (docs/report.tex)")
+    parser.add_argument("--engine", choices=["auto", "latexmk", "pdflatex"], default="auto")
+    parser.add_argument("--tex", action="append", default=None, help="TeX filename or glob relative to docs/ (default: report.tex). Can be passed multiple times; files are built in parallel.")
+    parser.add_argument("--passes", type=int, default=2, help="Maximum pdflatex passes when not using latexmk; stops early once aux files are stable")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Maximum number of .tex files built concurrently")
+    parser.add_argument("--no-shell-escape", action="store_true", help="Disable -shell-escape")
+    parser.add_argument("--texbin", action="append", default=[], help="Directory with TeX binaries (pdflatex/latexmk). Can be passed multiple times; prepended to PATH for this run.")
+    parser.add_argument("--inkscape-bin", action="append", default=[], help="Directory with Inkscape binary; prepended to PATH for this run.")
+    args = parser.parse_args()
+
+    docs_dir = Path(__file__).resolve().parent
+    tex_paths = resolve_tex_files(docs_dir, args.tex or ["report.tex"])
+
+    if not tex_paths:
+        print(f"[ERROR] No TeX files match: {', '.join(args.tex)}")
+        return 1
+    for tex_path in tex_paths:
+        if not tex_path.exists():
+            print(f"[ERROR] TeX file not found: {tex_path}")
+            return 1
+
+    # Ensure tools are reachable on PATH for this process
+    ensure_tools_on_path(args.texbin, args.inkscape_bin)
+
+    # Detect inkscape if SVGs are included
+    includesvg = False
+    for tex_path in tex_paths:
+        try:
+            content = tex_path.read_text(encoding="utf-8", errors="ignore")
+            includesvg = includesvg or "\\includesvg" in content
+        except Exception:
+            pass
+
+    if includesvg and which("inkscape") is None and not args.no_shell_escape:
+        print("[WARN] Inkscape not found on PATH, but \\includesvg is used.")
+        print("       Install Inkscape or rerun with --no-shell-escape and replace \\includesvg with \\includegraphics.")
+
+    # Choose engine
+    engine = args.engine
+    if engine == "auto":
+        engine = "latexmk" if which("latexmk") else "pdflatex"
+
+    if engine == "latexmk" and which("latexmk") is None:
+        print("[ERROR] latexmk not found on PATH; choose --engine pdflatex or install latexmk.")
+        return 2
+    if engine == "pdflatex" and which("pdflatex") is None:
+        print("[ERROR] pdflatex not found on PATH. Install MiKTeX/TeX Live or use --texbin to point to it.")
+        return 3
+
+    shell_escape_flag = [] if args.no_shell_escape else ["-shell-escape"]
+    passes = max(1, int(args.passes))
+
+    if len(tex_paths) == 1:
+        return build_tex(tex_paths[0], engine, passes, shell_escape_flag)
+
+    # Each worker only waits on its own pdflatex/latexmk child process, so
+    # threads are enough to keep one TeX run per core busy.
+    workers = max(1, min(args.jobs, len(tex_paths)))
+    print(f"[INFO] Building {len(tex_paths)} files with {workers} parallel jobs")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        codes = list(pool.map(lambda p: build_tex(p, engine, passes, shell_escape_flag), tex_paths))
+    failed = [(p, c) for p, c in zip(tex_paths, codes) if c != 0]
+    for p, c in failed:
+        print(f"[ERROR] {p.name} failed with exit code {c}")
+    return failed[0][1] if failed else 0
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -5,9 +5,10 @@ Generate a PDF similar to docs/report.pdf using pure Python (no LaTeX).
 Approach
 - Uses matplotlib.backends.backend_pdf.PdfPages to assemble pages.
 - Renders text and simple lists onto A4-sized figures.
-- Attempts to include docs/flowchart.svg by converting it to PNG via Inkscape
-  if available (subprocess). If Inkscape is unavailable, the figure is skipped
-  with a visible note.
+- Attempts to include docs/flowchart.svg by rendering it in-process with
+  cairosvg or svglib+reportlab, falling back to an Inkscape subprocess if
+  neither is installed. If no renderer works, the figure is skipped with a
+  visible note.
 
 Output
 - docs/report_python.pdf
@@ -18,6 +19,9 @@ Usage
 
 from __future__ import annotations
 
+import functools
+import io
+import shutil
 import subprocess
 from pathlib import Path
 import sys
@@ -26,9 +30,21 @@ from datetime import date
 
 import matplotlib
 matplotlib.use("Agg")  # headless, file-only backend
+import matplotlib.image as mpimg
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 
+try:
+    import cairosvg  # type: ignore
+except (ImportError, OSError):  # optional; OSError when the native libcairo is missing
+    cairosvg = None
+
+try:
+    from svglib.svglib import svg2rlg  # type: ignore
+    from reportlab.graphics import renderPM  # type: ignore
+except (ImportError, OSError):  # optional dependency
+    svg2rlg = None
+
 
 DOCS = Path(__file__).resolve().parent
 SVG_PATH = DOCS / "flowchart.svg"
@@ -36,12 +52,10 @@ TMP_PNG = DOCS / "flowchart_tmp.png"
 OUTPUT_PDF = DOCS / "report_python.pdf"
 
 
+@functools.lru_cache(maxsize=None)
 def which(prog: str) -> bool:
-    try:
-        subprocess.run([prog, "--version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
-        return True
-    except FileNotFoundError:
-        return False
+    """Return True if prog is on PATH (memoized PATH scan, no subprocess)."""
+    return shutil.which(prog) is not None
 
 
 def try_convert_svg_to_png(svg: Path, png: Path) -> bool:
@@ -77,9 +91,40 @@ def try_convert_svg_to_png(svg: Path, png: Path) -> bool:
     return False
 
 
+def load_svg_image(svg: Path, width: int = 1200):
+    """Rasterize an SVG to an image array for imshow, or return None.
+
+    Tries, in order: cairosvg in memory, svglib+reportlab (renderPM) in
+    memory, and finally Inkscape converting to TMP_PNG.
+    """
+    if not svg.exists():
+        return None
+    if cairosvg is not None:
+        try:
+            png = cairosvg.svg2png(url=str(svg), output_width=width)
+            return mpimg.imread(io.BytesIO(png), format="png")
+        except Exception:
+            pass
+    if svg2rlg is not None:
+        try:
+            drawing = svg2rlg(str(svg))
+            if drawing is not None:
+                return mpimg.pil_to_array(renderPM.drawToPIL(drawing, dpi=200))
+        except Exception:
+            pass
+    if try_convert_svg_to_png(svg, TMP_PNG) and TMP_PNG.exists():
+        return mpimg.imread(TMP_PNG)
+    return None
+
+
+_WRAPPERS: dict[int, textwrap.TextWrapper] = {}
+
+
 def draw_wrapped_text(ax, text: str, x: float, y: float, width_chars: int, line_height: float, fontsize: int = 11, weight: str = "normal") -> float:
     """Draw text wrapped to width_chars at (x,y) top-down, returns next y."""
-    wrapper = textwrap.TextWrapper(width=width_chars, replace_whitespace=False, drop_whitespace=False)
+    wrapper = _WRAPPERS.get(width_chars)
+    if wrapper is None:
+        wrapper = _WRAPPERS[width_chars] = textwrap.TextWrapper(width=width_chars, replace_whitespace=False, drop_whitespace=False)
     for paragraph in text.splitlines():
         if paragraph.strip() == "":
             y -= line_height
@@ -90,9 +135,9 @@ def draw_wrapped_text(ax, text: str, x: float, y: float, width_chars: int, line_
     return y
 
 
-def new_page():
-    # A4 in inches
-    fig = plt.figure(figsize=(8.27, 11.69), dpi=150)
+def new_page(dpi: int = 72):
+    # A4 in inches; text is vector, so dpi only matters for raster images (imshow)
+    fig = plt.figure(figsize=(8.27, 11.69), dpi=dpi)
     ax = fig.add_axes([0, 0, 1, 1])
     ax.set_axis_off()
     return fig, ax
@@ -125,7 +170,7 @@ def main() -> int:
         plt.close(fig)
 
         # Algorithm overview + flowchart
-        fig, ax = new_page()
+        fig, ax = new_page(dpi=200)
         y = 0.95
         y = draw_wrapped_text(ax, "Pregled algoritma", 0.10, y, width_chars=90, line_height=0.035, fontsize=16, weight='bold')
         y -= 0.01
@@ -143,17 +188,15 @@ def main() -> int:
 
         # Flowchart image (if we can convert)
         img_drawn = False
-        if SVG_PATH.exists():
-            if try_convert_svg_to_png(SVG_PATH, TMP_PNG) and TMP_PNG.exists():
-                import matplotlib.image as mpimg
-                img = mpimg.imread(TMP_PNG)
-                # Place image centered
-                ax.imshow(img, extent=(0.10, 0.90, 0.15, 0.55), aspect='auto')
-                img_drawn = True
+        img = load_svg_image(SVG_PATH)
+        if img is not None:
+            # Place image centered
+            ax.imshow(img, extent=(0.10, 0.90, 0.15, 0.55), aspect='auto')
+            img_drawn = True
         if not img_drawn:
             note = (
-                "Flowchart (SVG) ni bil vključen. Za vključen prikaz namestite Inkscape "
-                "(na PATH) ali pretvorite docs/flowchart.svg v PNG in zamenjajte pot."
+                "Flowchart (SVG) ni bil vključen. Za vključen prikaz namestite cairosvg "
+                "ali svglib+reportlab (pip) ali Inkscape (na PATH)."
             )
             y = draw_wrapped_text(ax, note, 0.10, 0.60, width_chars=90, line_height=0.030, fontsize=10, weight='bold')
 
@@ -168,9 +211,10 @@ def main() -> int:
         py_bullets = [
             "SimulationConfig: resolution, steps, dt, strength, fps, live_view, gif_name, output_dir.",
             "Tok in hitrost: stream_function, velocity_field, gaussian_blur.",
-            "Vzorčenje in advekcija: bilinear_sample, advect.",
+            "Vzorčenje in advekcija: advect (bilinearno, scipy map_coordinates).",
             "Inicializacija barvila: create_initial_dye (modri toni + šum + vinjeta).",
-            "Zanka: v, advekcija, dušenje, zbiranje slik; imageio.mimsave za GIF.",
+            "Zanka: v, advekcija, dušenje; sprotni zapis slik v GIF z imageio.get_writer.",
+            "Živ prikaz (neobvezno): OpenCV okno, sicer matplotlib.",
         ]
         for b in py_bullets:
             y = draw_wrapped_text(ax, f"• {b}", 0.12, y, width_chars=92, line_height=0.030, fontsize=11)
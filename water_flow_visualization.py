@@ -3,19 +3,65 @@
 
 from __future__ import annotations
 
+import functools
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, List, Optional, Tuple
 
 import matplotlib.pyplot as plt
 import numpy as np
+import scipy.ndimage
 
 try:
     import imageio.v2 as imageio  # type: ignore
 except ImportError:  # pragma: no cover - optional dependency
     imageio = None
 
+try:
+    import numexpr  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    numexpr = None
+
+try:
+    from numba import njit, prange  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    njit = None
+    prange = range
+
+try:
+    import cv2  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    cv2 = None
+
+try:
+    import cupy  # type: ignore
+    import cupyx.scipy.ndimage  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    cupy = None
+
+BACKENDS = ("auto", "numpy", "numba", "cupy")
+WINDOW_TITLE = "Procedural Water Flow"
+
+
+# Exact partial derivatives of ``stream_function`` for numexpr to evaluate in one pass.
+# Float constants are passed in as typed scalars: numexpr treats float literals as
+# doubles and would otherwise upcast float32 grids.
+_DPSI_DX_EXPR = (
+    "k1 * cos(w * (3 * x + p1)) * sin(w * (3 * y - p2))"
+    " - k2 * sin(w * (2 * x - p3)) * cos(w * (2 * y + p4))"
+    " + k3 * cos(w * (4 * x + y + p5))"
+)
+_DPSI_DY_EXPR = (
+    "k1 * sin(w * (3 * x + p1)) * cos(w * (3 * y - p2))"
+    " - k2 * cos(w * (2 * x - p3)) * sin(w * (2 * y + p4))"
+    " + k4 * cos(w * (4 * x + y + p5))"
+)
+
+# Dye dissipation weights; float32 scalars keep the blend from upcasting.
+DYE_KEEP = np.float32(0.995)
+DYE_RESTORE = np.float32(0.005)
+
 
 @dataclass
 class SimulationConfig:
@@ -27,11 +73,39 @@ class SimulationConfig:
     gif_name: str = "water_flow.gif"
     live_view: bool = True
     fps: int = 60
+    backend: str = "auto"
+
+
+def array_module(arr: np.ndarray):
+    """Return ``numpy`` or ``cupy`` depending on where ``arr`` lives."""
+    if cupy is not None:
+        return cupy.get_array_module(arr)
+    return np
+
+
+def ndimage_module(arr: np.ndarray):
+    """Return the ``scipy.ndimage`` flavour matching ``arr``'s array module."""
+    if cupy is not None and isinstance(arr, cupy.ndarray):
+        return cupyx.scipy.ndimage
+    return scipy.ndimage
+
+
+def resolve_backend(name: str) -> str:
+    """Map a requested backend to one that is importable in this environment."""
+    if name == "auto":
+        return "numba" if fused_step is not None else "numpy"
+    if name == "numba" and fused_step is None:
+        print("numba not available; falling back to numpy. Use `pip install numba` to enable it.")
+        return "numpy"
+    if name == "cupy" and cupy is None:
+        print("cupy not available; falling back to numpy. Install a CuPy build matching your CUDA version.")
+        return "numpy"
+    return name
 
 
 def build_grid(resolution: int) -> Tuple[np.ndarray, np.ndarray]:
     """Return normalized meshgrid coordinates in [0, 1)."""
-    axis = np.linspace(0.0, 1.0, resolution, endpoint=False)
+    axis = np.linspace(0.0, 1.0, resolution, endpoint=False, dtype=np.float32)
     return np.meshgrid(axis, axis, indexing="ij")
 
 
@@ -43,75 +117,188 @@ def stream_function(x: np.ndarray, y: np.ndarray, t: float) -> np.ndarray:
     return base + 0.6 * swirl + 0.25 * ripple
 
 
-def velocity_field(resolution: int, t: float, strength: float) -> np.ndarray:
-    """Compute a divergence-free velocity field from the stream function."""
-    x, y = build_grid(resolution)
-    psi = stream_function(x, y, t)
-    dpsi_dy = np.gradient(psi, axis=0)
-    dpsi_dx = np.gradient(psi, axis=1)
+def build_index_grid(resolution: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (row, column) pixel index grids, stored as float32."""
+    indices = np.arange(resolution, dtype=np.float32)
+    return np.meshgrid(indices, indices, indexing="ij")
 
-    u = dpsi_dy * strength * resolution  # horizontal component
-    v = -dpsi_dx * strength * resolution  # vertical component
-    velocity = np.stack((u, v), axis=-1)
 
-    # Slight smoothing keeps the motion fluid without losing curls.
-    velocity = gaussian_blur(velocity, sigma=1.0)
-    return velocity
+def stream_function_partials(x, y, t):
+    """Exact (d psi/dx, d psi/dy) of :func:`stream_function`.
 
+    Written with ``np.sin``/``np.cos`` only, so it works on scalars, NumPy and
+    CuPy arrays, and compiles under Numba for :func:`fused_step`.
+    """
+    a = 2 * np.pi * (3 * x + 0.7 * t)
+    b = 2 * np.pi * (3 * y - 0.5 * t)
+    c = 2 * np.pi * (2 * x - 0.3 * t)
+    d = 2 * np.pi * (2 * y + 0.4 * t)
+    cos_e = np.cos(2 * np.pi * (4 * x + y + 0.2 * t))
+    sin_a, cos_a = np.sin(a), np.cos(a)
+    sin_b, cos_b = np.sin(b), np.cos(b)
+    sin_c, cos_c = np.sin(c), np.cos(c)
+    sin_d, cos_d = np.sin(d), np.cos(d)
 
-def gaussian_blur(field: np.ndarray, sigma: float = 1.0) -> np.ndarray:
-    """Lightweight separable Gaussian blur implemented with numpy only."""
-    if sigma <= 0:
-        return field
+    dpsi_dx = 6 * np.pi * cos_a * sin_b - 2.4 * np.pi * sin_c * cos_d + 2 * np.pi * cos_e
+    dpsi_dy = 6 * np.pi * sin_a * cos_b - 2.4 * np.pi * cos_c * sin_d + 0.5 * np.pi * cos_e
+    return dpsi_dx, dpsi_dy
 
-    radius = int(max(1, sigma * 3))
-    offsets = np.arange(-radius, radius + 1)
-    weights = np.exp(-(offsets**2) / (2 * sigma**2))
-    weights /= weights.sum()
 
-    blurred = field.copy()
-    for axis in range(2):
-        blurred = np.apply_along_axis(
-            lambda m: np.convolve(m, weights, mode="same"), axis, blurred
-        )
-    return blurred
+_stream_function_partials_jit = njit(fastmath=True, cache=True)(stream_function_partials) if njit is not None else None
 
 
-def bilinear_sample(field: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
-    """Sample ``field`` at fractional coordinates (x, y) using bilinear interpolation."""
-    h, w = field.shape[:2]
-    x0 = np.floor(x).astype(int)
-    y0 = np.floor(y).astype(int)
-    x1 = np.clip(x0 + 1, 0, w - 1)
-    y1 = np.clip(y0 + 1, 0, h - 1)
+def stream_function_gradient(x: np.ndarray, y: np.ndarray, t: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the analytic partials (d psi/dx, d psi/dy) of :func:`stream_function`."""
+    xp = array_module(x)
+    if numexpr is not None and xp is np:
+        f = x.dtype.type
+        env = {
+            "x": x, "y": y, "w": f(2 * np.pi),
+            "p1": f(0.7 * t), "p2": f(0.5 * t), "p3": f(0.3 * t), "p4": f(0.4 * t), "p5": f(0.2 * t),
+            "k1": f(6 * np.pi), "k2": f(2.4 * np.pi), "k3": f(2 * np.pi), "k4": f(0.5 * np.pi),
+        }
+        return numexpr.evaluate(_DPSI_DX_EXPR, local_dict=env), numexpr.evaluate(_DPSI_DY_EXPR, local_dict=env)
 
-    x0 = np.clip(x0, 0, w - 1)
-    y0 = np.clip(y0, 0, h - 1)
+    return stream_function_partials(x, y, t)
 
-    fx = x - x0
-    fy = y - y0
 
-    top = field[y0, x0] * (1 - fx)[..., None] + field[y0, x1] * fx[..., None]
-    bottom = field[y1, x0] * (1 - fx)[..., None] + field[y1, x1] * fx[..., None]
-    return top * (1 - fy)[..., None] + bottom * fy[..., None]
+def velocity_field(x: np.ndarray, y: np.ndarray, t: float, strength: float) -> np.ndarray:
+    """Compute a divergence-free velocity field from the stream function.
 
+    ``x`` and ``y`` are the normalized grids returned by :func:`build_grid`.
+    The grid uses ``indexing="ij"``, so ``x`` varies along axis 0 (rows).
+    """
+    dpsi_dx, dpsi_dy = stream_function_gradient(x, y, t)
 
-def advect(field: np.ndarray, velocity: np.ndarray, dt: float) -> np.ndarray:
-    """Semi-Lagrangian advection step for a 3-channel field."""
-    h, w = field.shape[:2]
-    y, x = np.meshgrid(np.arange(h), np.arange(w), indexing="ij")
+    u = dpsi_dx * strength  # horizontal component
+    v = -dpsi_dy * strength  # vertical component
+    xp = array_module(u)
+    velocity = xp.stack((u, v), axis=-1).astype(xp.float32, copy=False)
 
-    x_back = x - dt * velocity[..., 0]
-    y_back = y - dt * velocity[..., 1]
+    # Slight smoothing keeps the motion fluid without losing curls.
+    velocity = gaussian_blur(velocity, sigma=1.0)
+    return velocity
 
-    x_back = np.clip(x_back, 0, w - 1)
-    y_back = np.clip(y_back, 0, h - 1)
 
-    return bilinear_sample(field, x_back, y_back)
+def gaussian_blur(field: np.ndarray, sigma: float = 1.0) -> np.ndarray:
+    """Separable Gaussian blur over the two spatial axes of ``field``."""
+    if sigma <= 0:
+        return field
 
+    # Match the previous kernel radius of max(1, 3 * sigma) samples.
+    truncate = max(1, int(sigma * 3)) / sigma
+    ndimage = ndimage_module(field)
+    blurred = ndimage.gaussian_filter1d(field, sigma=sigma, axis=0, mode="nearest", truncate=truncate)
+    blurred = ndimage.gaussian_filter1d(blurred, sigma=sigma, axis=1, mode="nearest", truncate=truncate)
+    return blurred
 
+
+def advect(
+    field: np.ndarray, velocity: np.ndarray, dt: float, iy: np.ndarray, ix: np.ndarray
+) -> np.ndarray:
+    """Semi-Lagrangian advection step for a 3-channel field.
+
+    ``iy`` and ``ix`` are the pixel index grids returned by :func:`build_index_grid`.
+    Back-traced positions are sampled bilinearly; ``mode="nearest"`` clamps them
+    to the field's edges.
+    """
+    xp = array_module(field)
+    ndimage = ndimage_module(field)
+    coords = xp.stack((iy - dt * velocity[..., 1], ix - dt * velocity[..., 0]))
+
+    out = xp.empty_like(field)
+    for channel in range(field.shape[-1]):
+        ndimage.map_coordinates(field[..., channel], coords, output=out[..., channel], order=1, mode="nearest")
+    return out
+
+
+def gaussian_weights(sigma: float) -> np.ndarray:
+    """Normalized 1D Gaussian kernel with the same radius as :func:`gaussian_blur`."""
+    radius = max(1, int(sigma * 3))
+    offsets = np.arange(-radius, radius + 1)
+    weights = np.exp(-(offsets**2) / (2 * sigma**2))
+    return (weights / weights.sum()).astype(np.float32)
+
+
+def _fused_step(
+    dye: np.ndarray,
+    base_dye: np.ndarray,
+    out: np.ndarray,
+    frame: Optional[np.ndarray],
+    vel: np.ndarray,
+    tmp: np.ndarray,
+    t: float,
+    dt: float,
+    strength: float,
+    weights: np.ndarray,
+) -> None:
+    """One full simulation step written as explicit loops for Numba.
+
+    Equivalent to ``velocity_field`` + ``advect`` + dissipation, but every stage
+    runs row-parallel without NumPy temporaries. ``vel`` and ``tmp`` are
+    (H, W, 2) scratch buffers; the new dye is written into ``out`` and, unless
+    ``frame`` is None, its clipped uint8 image into ``frame`` in the same sweep.
+    """
+    h, w, channels = dye.shape
+    radius = weights.shape[0] // 2
+
+    # Analytic velocity (see stream_function_partials).
+    for i in prange(h):
+        x = i / h
+        for j in range(w):
+            dpsi_dx, dpsi_dy = _stream_function_partials_jit(x, j / w, t)
+            vel[i, j, 0] = strength * dpsi_dx
+            vel[i, j, 1] = -strength * dpsi_dy
+
+    # Separable Gaussian blur, first pass along rows (edge samples clamped).
+    for i in prange(h):
+        for j in range(w):
+            su = 0.0
+            sv = 0.0
+            for k in range(-radius, radius + 1):
+                ii = min(max(i + k, 0), h - 1)
+                su += weights[k + radius] * vel[ii, j, 0]
+                sv += weights[k + radius] * vel[ii, j, 1]
+            tmp[i, j, 0] = su
+            tmp[i, j, 1] = sv
+
+    # Second blur pass, bilinear back-trace and dissipation in one sweep.
+    for i in prange(h):
+        for j in range(w):
+            u = 0.0
+            v = 0.0
+            for k in range(-radius, radius + 1):
+                jj = min(max(j + k, 0), w - 1)
+                u += weights[k + radius] * tmp[i, jj, 0]
+                v += weights[k + radius] * tmp[i, jj, 1]
+
+            x_back = min(max(j - dt * u, 0.0), w - 1.0)
+            y_back = min(max(i - dt * v, 0.0), h - 1.0)
+            x0 = int(x_back)
+            y0 = int(y_back)
+            x1 = min(x0 + 1, w - 1)
+            y1 = min(y0 + 1, h - 1)
+            fx = x_back - x0
+            fy = y_back - y0
+            for c in range(channels):
+                top = dye[y0, x0, c] * (1.0 - fx) + dye[y0, x1, c] * fx
+                bottom = dye[y1, x0, c] * (1.0 - fx) + dye[y1, x1, c] * fx
+                sample = top * (1.0 - fy) + bottom * fy
+                out[i, j, c] = DYE_KEEP * sample + DYE_RESTORE * base_dye[i, j, c]
+                if frame is not None:
+                    frame[i, j, c] = np.uint8(min(max(out[i, j, c], 0.0), 255.0))
+
+
+fused_step = njit(parallel=True, fastmath=True, cache=True)(_fused_step) if njit is not None else None
+
+
+@functools.lru_cache(maxsize=8)
 def create_initial_dye(resolution: int) -> np.ndarray:
-    """Create a blue-ish dye field with subtle turbulence."""
+    """Create a blue-ish dye field with subtle turbulence.
+
+    The result is cached per resolution and returned read-only; copy it
+    before modifying.
+    """
     rng = np.random.default_rng(42)
     base_color = np.array([30, 90, 180], dtype=np.float32)
     dye = np.full((resolution, resolution, 3), base_color, dtype=np.float32)
@@ -119,67 +306,147 @@ def create_initial_dye(resolution: int) -> np.ndarray:
     turbulence = rng.normal(0.0, 20.0, size=(resolution, resolution, 3))
     dye += turbulence
 
-    vignette = np.hypot(*np.meshgrid(np.linspace(-1, 1, resolution),
-                                      np.linspace(-1, 1, resolution)))
-    vignette = np.clip(1.0 - 0.8 * vignette, 0.2, 1.0)
+    # Radial falloff from broadcast 1D axes instead of two full meshgrids.
+    r = np.linspace(-1, 1, resolution, dtype=np.float32)
+    vignette = np.clip(1.0 - 0.8 * np.sqrt(r[:, None] ** 2 + r[None, :] ** 2), 0.2, 1.0)
     dye *= vignette[..., None]
 
-    return np.clip(dye, 0, 255)
+    np.clip(dye, 0, 255, out=dye)
+    dye.setflags(write=False)
+    return dye
+
+
+def dye_to_frame(dye: np.ndarray) -> np.ndarray:
+    """Clip ``dye`` to [0, 255] and truncate it into a new uint8 array in one pass."""
+    xp = array_module(dye)
+    frame = xp.empty(dye.shape, dtype=xp.uint8)
+    if xp is np:
+        np.clip(dye, 0, 255, out=frame, casting="unsafe")
+    else:
+        # cupy.clip takes no casting argument; cast the clipped field in one kernel.
+        frame[...] = xp.clip(dye, 0, 255)
+    return frame
+
+
+def open_cv2_window() -> bool:
+    """Open the OpenCV preview window; False if cv2 is missing or has no GUI support."""
+    if cv2 is None:
+        return False
+    try:
+        cv2.namedWindow(WINDOW_TITLE, cv2.WINDOW_AUTOSIZE)
+    except cv2.error:  # e.g. opencv-python-headless
+        return False
+    return True
 
 
 def ensure_output_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
-def run_simulation(config: SimulationConfig) -> List[np.ndarray]:
-    """Run the fluid advection simulation, streaming frames if requested."""
-    base_dye = create_initial_dye(config.resolution)
+def run_simulation(config: SimulationConfig, writer: Optional[Any] = None) -> None:
+    """Run the fluid advection simulation, streaming frames if requested.
+
+    Each uint8 frame is passed to ``writer.append_data`` (see
+    :func:`open_gif_writer`) as soon as it is produced; the writer encodes it
+    to disk immediately, so no frames are kept in memory. With the ``cupy`` backend all per-frame math stays on the GPU;
+    the uint8 frame is only built and copied back to the host when there is a
+    writer or a live view to receive it.
+    """
+    backend = resolve_backend(config.backend)
+    xp = cupy if backend == "cupy" else np
+
+    initial_dye = create_initial_dye(config.resolution)
+    base_dye = xp.asarray(initial_dye)
     dye = base_dye.copy()
-    frames: List[np.ndarray] = []
+    x, y = (xp.asarray(a) for a in build_grid(config.resolution))
+    iy, ix = (xp.asarray(a) for a in build_index_grid(config.resolution))
+
+    # The numba backend runs the whole step as one compiled kernel.
+    if backend == "numba":
+        next_dye = np.empty_like(dye)
+        vel = np.empty((config.resolution, config.resolution, 2), dtype=np.float32)
+        tmp = np.empty_like(vel)
+        weights = gaussian_weights(1.0)
+    else:
+        # base_dye never changes, so its share of the blend is computed once.
+        restore = DYE_RESTORE * base_dye
 
     fig = ax = im = None
     pause_time = max(0.0005, 1.0 / config.fps)
 
-    if config.live_view:
+    # OpenCV blits frames directly; matplotlib is the fallback preview.
+    use_cv2 = config.live_view and open_cv2_window()
+
+    if config.live_view and not use_cv2:
         plt.ion()
         fig, ax = plt.subplots(figsize=(6, 6))
-        im = ax.imshow(np.clip(dye, 0, 255).astype(np.uint8))
-        ax.set_title("Procedural Water Flow")
+        im = ax.imshow(np.clip(initial_dye, 0, 255).astype(np.uint8))
+        ax.set_title(WINDOW_TITLE)
         ax.axis("off")
         plt.show(block=False)
 
+    needs_frame = writer is not None or config.live_view
     for step in range(config.steps):
         t = step / config.steps * 6.0
-        vel = velocity_field(config.resolution, t, config.strength)
-        dye = advect(dye, vel, config.dt)
-
-        # Gentle dissipation and color balancing keeps the palette vibrant.
-        dye = 0.995 * dye + 0.005 * base_dye
-        frame = np.clip(dye, 0, 255).astype(np.uint8)
-        frames.append(frame)
-
-        if config.live_view and im is not None:
+        if backend == "numba":
+            # A fresh frame each step: the writer and live view may keep a reference.
+            frame = np.empty(dye.shape, dtype=np.uint8) if needs_frame else None
+            fused_step(dye, base_dye, next_dye, frame, vel, tmp, t, config.dt, config.strength, weights)
+            dye, next_dye = next_dye, dye
+        else:
+            vel = velocity_field(x, y, t, config.strength)
+            dye = advect(dye, vel, config.dt, iy, ix)
+
+            # Gentle dissipation and color balancing keeps the palette vibrant.
+            # advect returns a fresh array, so blend in place.
+            dye *= DYE_KEEP
+            dye += restore
+        assert dye.dtype == np.float32, dye.dtype
+
+        # Only build (and, on the GPU, download) a frame someone will see.
+        if not needs_frame:
+            continue
+        if backend != "numba":
+            frame = dye_to_frame(dye)
+        if xp is not np:
+            frame = cupy.asnumpy(frame)
+        if writer is not None:
+            writer.append_data(frame)
+
+        if use_cv2:
+            cv2.imshow(WINDOW_TITLE, frame[..., ::-1])  # RGB -> BGR
+            cv2.waitKey(1)
+        elif config.live_view and im is not None:
             im.set_data(frame)
             fig.canvas.draw_idle()
             fig.canvas.flush_events()
             plt.pause(pause_time)
 
-    if config.live_view:
+    if use_cv2:
+        # Keep the last frame up until a key is pressed or the window is closed,
+        # like plt.show(); waitKey(0) alone would hang on a closed window.
+        while cv2.getWindowProperty(WINDOW_TITLE, cv2.WND_PROP_VISIBLE) >= 1 and cv2.waitKey(50) == -1:
+            pass
+        cv2.destroyWindow(WINDOW_TITLE)
+    elif config.live_view:
         plt.ioff()
         plt.show()
 
-    return frames
 
+def open_gif_writer(config: SimulationConfig) -> Optional[Any]:
+    """Open a streaming GIF writer for ``config``, or ``None`` without imageio.
 
-def save_gif(frames: List[np.ndarray], config: SimulationConfig) -> None:
+    Uses imageio's legacy ``GIF-PIL`` format, which quantizes and writes each
+    frame as it is appended (the default Pillow plugin buffers every frame
+    until ``close()``).
+    """
     if imageio is None:
         print("imageio not available; skipping GIF export. Use `pip install imageio` to enable it.")
-        return
+        return None
 
     ensure_output_dir(config.output_dir)
     output_path = config.output_dir / config.gif_name
-    imageio.mimsave(output_path, frames, fps=config.fps)
-    print(f"Saved animation to {output_path}")
+    return imageio.get_writer(output_path, format="GIF-PIL", mode="I", fps=config.fps)
 
 
 def apply_cli_overrides(config: SimulationConfig, args: List[str]) -> SimulationConfig:
@@ -214,6 +481,10 @@ def apply_cli_overrides(config: SimulationConfig, args: List[str]) -> Simulation
                 config.output_dir = Path(value)
             elif opt == "fps":
                 config.fps = int(value)
+            elif opt == "backend":
+                if value not in BACKENDS:
+                    raise ValueError(f"expected one of {', '.join(BACKENDS)}")
+                config.backend = value
             else:
                 print(f"Unknown option '--{opt}'.")
         except ValueError as exc:
@@ -224,8 +495,14 @@ def apply_cli_overrides(config: SimulationConfig, args: List[str]) -> Simulation
 def main() -> None:
     config = SimulationConfig()
     config = apply_cli_overrides(config, sys.argv[1:])
-    frames = run_simulation(config)
-    save_gif(frames, config)
+    writer = open_gif_writer(config)
+    if writer is None:
+        run_simulation(config)
+        return
+
+    with writer:
+        run_simulation(config, writer)
+    print(f"Saved animation to {config.output_dir / config.gif_name}")
 
 
 if __name__ == "__main__":